@@ -5,6 +5,7 @@ TOOLS_DIR = MODULE_GEN_DIR.parent
 ROOT_DIR = TOOLS_DIR.parent
 TEMPLATES_DIR = MODULE_GEN_DIR / "templates"
 HTML_DIR = MODULE_GEN_DIR / "html"
+CACHE_DIR = MODULE_GEN_DIR / ".cache"
 API_HTML = (
     HTML_DIR / "ReaScript API — Documentation.html"
 )  # downloaded from https://www.extremraym.com/cloud/reascript-doc/
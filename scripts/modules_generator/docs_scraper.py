@@ -1,12 +1,19 @@
+import functools
+import hashlib
 import json
 import logging
+import pickle
 import re
+import string
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Annotated, Iterator
+from pathlib import Path
+from typing import Annotated, Callable, Iterator
 
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 from modules_generator import (
     API_HTML,
+    CACHE_DIR,
     LUA_KEYWORDS,
     REAPER_TYPES,
     UNSUPPORTED_NAMESPACES,
@@ -70,15 +77,69 @@ REAPER_NAMESPACES = (
     "Undo",
 )
 
-
-@dataclass
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+_LOWER_OR_DIGIT = frozenset(string.ascii_lowercase + string.digits)
+_SIG_RE = re.compile(r"\w+\s*\(\s*[^)]*\s*\)")
+_ARGS_RE = re.compile(r"\(([^)]*)\)")
+_FN_NAME_RE = re.compile(r"\b\w+(?=\s*\()")
+_CONST_NAME_RE = re.compile(r"^[A-Z]+(?:_[A-Z]+)*$")
+_DEPRECATED_RE = re.compile(r"deprecated|discouraged", re.IGNORECASE)
+# Characters removed from the function docs.
+_DOCS_STRIP = str.maketrans("", "", "\u00a0")
+
+# ReaProject functions superseded by a newer version, which takes over their ReaWrap name.
+REAPROJECT_SUPERSEDED = (
+    "add_project_marker",
+    "count_selected_tracks",
+    "enum_project_markers2",
+    "get_selected_track",
+)
+REAPROJECT_RENAMES = {
+    "add_project_marker2": "add_project_marker",
+    "count_selected_tracks2": "count_selected_tracks",
+    "enum_project_markers3": "enum_project_markers",
+    "get_play_position2_ex": "get_play_position",
+    "get_play_position_ex": "get_play_position_lat_comp",
+    "get_project_time_signature2": "get_project_time_signature",
+    "get_selected_track2": "get_selected_track",
+}
+
+# Argument names ending/starting with these words get an underscore to separate the word, e.g. trackidx -> track_idx.
+_SUFFIX_REWRITES = {
+    "idx": "_idx",
+    "name": "_name",
+    "type": "_type",
+    "val": "_val",
+    "pos": "_pos",
+}
+_PREFIX_REWRITES = {
+    "is": "is_",
+    "swing": "swing_",
+    "nudge": "nudge_",
+    "timesig": "time_sig",
+}
+_SUFFIXES = tuple(_SUFFIX_REWRITES)
+_PREFIXES = tuple(_PREFIX_REWRITES)
+
+# Only the API and built-in Lua sections are read, skip building the rest of the document.
+API_SECTIONS_STRAINER = SoupStrainer("section", class_=["functions_all", "lua"])
+
+# Lua default values of optional arguments by type, anything else defaults to nil.
+DEFAULT_VALUES = {
+    "boolean": "false",
+    "number": "0",
+    "string": '""',
+}
+
+
+@dataclass(slots=True)
 class ReaType:
     reascript_type: str
     name: str | None = None
     is_optional: bool = False
     description: str | None = None
     is_pointer: bool = False
-    _default_value: str | None = None
 
     @property
     def is_reaper_type(self) -> bool:
@@ -127,23 +188,10 @@ class ReaType:
 
     @property
     def default_value(self) -> str:
-        if self._default_value is None:
-            if self.reascript_type == "boolean":
-                self._default_value = "false"
-            elif self.reascript_type == "number":
-                self._default_value = "0"
-            elif self.reascript_type == "string":
-                self._default_value = '""'
-            else:
-                self._default_value = "nil"
-        return self._default_value
-
-    @default_value.setter
-    def default_value(self, value: str):
-        self._default_value = value
+        return DEFAULT_VALUES.get(self.reascript_type, "nil")
 
 
-@dataclass
+@dataclass(slots=True)
 class ReaFunc:
     signature: Annotated[str, "The function signature including arguments."]
     reascript_name: Annotated[str, "The function name as per Reaper API."]
@@ -161,35 +209,42 @@ class ReaFunc:
 
 
 def to_snake(s: str) -> str:
-    # Add an underscore before each uppercase letter that is followed by a lowercase letter
-    s = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", s)
-    # Add an underscore before each lowercase letter that is preceded by an uppercase letter
-    s = re.sub(r"([a-z\d])([A-Z])", r"\1_\2", s)
-    # Convert the entire string to lowercase
-    s = s.lower()
-    return s
+    out = []
+    prev = ""
+    for i, c in enumerate(s):
+        if c in _UPPER and (
+            # Add an underscore before each uppercase letter that is preceded by a lowercase letter or digit
+            prev in _LOWER_OR_DIGIT
+            # Add an underscore before each uppercase letter that ends an acronym and starts a word, e.g. MIDIEditor
+            or prev in _UPPER
+            and s[i + 1 : i + 2] in _LOWER
+        ):
+            out.append("_")
+        # Convert the entire string to lowercase
+        out.append(c.lower())
+        prev = c
+    return "".join(out)
 
 
-def get_html_from_file(html_file: str) -> BeautifulSoup:
-    """Get the HTML content from a file."""
+def get_html_from_file(
+    html_file: str, parse_only: SoupStrainer | None = None
+) -> BeautifulSoup:
+    """Get the HTML content from a file, optionally restricted to the elements matched by `parse_only`."""
     with open(html_file, "r") as file:
-        return BeautifulSoup(file, "html.parser")
+        return BeautifulSoup(file, "lxml", parse_only=parse_only)
 
 
 def get_function_signature(parts: list[str]) -> str:
     """Get the function signature from a list of parts."""
-
-    pattern = r"\w+\s*\(\s*[^)]*\s*\)"
     for part in parts:
-        if re.match(pattern, part):
+        if _SIG_RE.match(part):
             return part
     raise ValueError(f"Could not find function signature in {parts}")
 
 
 def get_arguments(signature: str) -> list[str]:
     """Get the arguments from a function signature."""
-    pattern = r"\(([^)]*)\)"
-    match = re.search(pattern, signature)
+    match = _ARGS_RE.search(signature)
     if match:
         return match.group(1).split(",")
     raise ValueError(f"Could not find arguments in {signature}")
@@ -211,29 +266,17 @@ def sanitize_name(parts: list[str]) -> str:
         name = f"{name}_"
     if name:
         name = name.replace(".", "")
-        if name.endswith("idx") and name != "idx":
-            name = name.replace("idx", "_idx")
-        elif name.endswith("name") and name != "name":
-            name = name.replace("name", "_name")
-        elif name.endswith("type") and name != "type":
-            name = name.replace("type", "_type")
-        elif name.endswith("val") and name != "val":
-            name = name.replace("val", "_val")
-        elif name.endswith("pos") and name != "pos":
-            name = name.replace("pos", "_pos")
-        elif name.startswith("is"):
-            name = name.replace("is", "is_")
-        elif name.startswith("swing") and name != "swing":
-            name = name.replace("swing", "swing_")
-        elif name.startswith("nudge") and name != "nudge":
-            name = name.replace("nudge", "nudge_")
-        elif name.startswith("timesig") and name != "timesig":
-            name = name.replace("timesig", "time_sig")
+        if name.endswith(_SUFFIXES) and name not in _SUFFIX_REWRITES:
+            suffix = next(s for s in _SUFFIXES if name.endswith(s))
+            name = name.replace(suffix, _SUFFIX_REWRITES[suffix])
+        elif name.startswith(_PREFIXES) and name not in _PREFIX_REWRITES:
+            prefix = next(p for p in _PREFIXES if name.startswith(p))
+            name = name.replace(prefix, _PREFIX_REWRITES[prefix])
         elif name == "guid_guid":
             name = "guid"
         if name.startswith("__"):
             name = name.replace("__", "")
-        if "__" in name:
+        while "__" in name:
             name = name.replace("__", "_")
     return name
 
@@ -261,8 +304,7 @@ def iter_types_and_names(types_and_names: str) -> Iterator[ReaType]:
 
 def get_function_name(signature: str) -> str:
     """Get the function name from a function signature."""
-    pattern = r"\b\w+(?=\s*\()"
-    match = re.search(pattern, signature)
+    match = _FN_NAME_RE.search(signature)
     if match:
         return match.group(0)
     raise ValueError(f"Could not find function name in {signature}")
@@ -328,30 +370,31 @@ def parse_constants_from_docs(docs_soup: BeautifulSoup) -> tuple[str, list[ReaTy
             return "boolean"
         return "any"
 
-    pattern = r"^[A-Z]+(?:_[A-Z]+)*$"
     docs, constants = [], []
     for child in docs_soup.children:
-        parts = [p.strip() for p in child.get_text(strip=True).split(":") if p.strip()]
-        if len(parts) > 1:
-            if re.match(pattern, parts[0]):
-                name = parts[0]
-                if len(parts) == 3:
-                    type_ = convert_to_lua_type(parts[1])
-                    description = parts[2]
-                elif len(parts) == 2:
-                    type_ = infer_type_from_description(parts[1])
-                    description = parts[1]
-                else:
-                    type_ = convert_to_lua_type(parts[1])
-                    description = "".join(parts[1:])
-                constants.append(
-                    ReaType(reascript_type=type_, name=name, description=description)
-                )
+        text = child.get_text(strip=True)
+        if not text:
+            continue
+        # name:type:description, anything after the second colon belongs to the description
+        parts = [p.strip() for p in text.split(":", 2) if p.strip()]
+        if (
+            len(parts) > 1
+            and parts[0].isupper()
+            and _CONST_NAME_RE.match(parts[0])
+        ):
+            name = parts[0]
+            if len(parts) == 3:
+                type_ = convert_to_lua_type(parts[1])
+                description = parts[2]
             else:
-                docs.append(child.get_text(strip=True))
+                type_ = infer_type_from_description(parts[1])
+                description = parts[1]
+            constants.append(
+                ReaType(reascript_type=type_, name=name, description=description)
+            )
         else:
-            docs.append(child.get_text(strip=True))
-    return "".join([d for d in docs if d]), constants
+            docs.append(text)
+    return "".join(docs), constants
 
 
 def iter_lua_functions(soup: BeautifulSoup, built_in: bool = False) -> dict[str, str]:
@@ -361,7 +404,7 @@ def iter_lua_functions(soup: BeautifulSoup, built_in: bool = False) -> dict[str,
     ):
         l_func = func.find("div", class_="l_func")
         docs = func.find("p")
-        docstr = docs.text.replace("\u00a0", "") if docs else None
+        docstr = docs.text.translate(_DOCS_STRIP) if docs else None
         constants = None
         lua_func = parse_lua_function(l_func.text)
         if "Info" in lua_func["reascript_name"] and docs:
@@ -388,10 +431,8 @@ def iter_lua_functions(soup: BeautifulSoup, built_in: bool = False) -> dict[str,
                 logger.error(f"Error parsing built-in function: {e} - {l_func.text}")
 
 
-def group_functions_by_name_space(
-    functions: list[ReaFunc],
-) -> dict[str, list[ReaFunc]]:
-    """Parse the REAPER API functions and group them by namespace.
+def get_name_space(l_func: ReaFunc) -> str:
+    """Get the namespace of a REAPER API function.
     The criteria for namespaces are the following:
     If the function name has an underscore, the part before the underscore is the namespace, if upper case.
     If the first argument of a function is of `Reaper` type, the namespace is the type name.
@@ -402,36 +443,28 @@ def group_functions_by_name_space(
     """
     track_fx_exceptions = ("TrackFX_Delete", "TrackFX_GetCount")
     take_fx_exceptions = ("TakeFX_Delete", "TakeFX_GetCount")
-    by_name_space = {}
-    for l_func in functions:
-        # the or condition is for user namespaces, e.g. BR, CF
-        if (
-            l_func.fn_name_space == "TrackFX" or "TrackFX" in l_func.reascript_name
-        ) and l_func.reascript_name not in track_fx_exceptions:
-            namespace = "TrackFX"
-        # the or condition is for user namespaces, e.g. BR, CF
-        elif (
-            l_func.fn_name_space == "TakeFX" or "TakeFX" in l_func.reascript_name
-        ) and l_func.reascript_name not in take_fx_exceptions:
-            namespace = "TakeFX"
-        elif (
-            l_func.fn_name_space == "PCM"
-            or l_func.arguments
-            and l_func.arguments[0].reascript_type in ("PCM_source", "PCM_sink")
-        ):
-            namespace = "PCM"
-        elif l_func.arguments and l_func.arguments[0].reascript_type in REAPER_TYPES:
-            namespace = l_func.arguments[0].reascript_type
-
-        elif l_func.fn_name_space in REAPER_NAMESPACES or l_func.fn_name_space is None:
-            namespace = "Reaper"
-        else:
-            namespace = l_func.fn_name_space
+    # the or condition is for user namespaces, e.g. BR, CF
+    if (
+        l_func.fn_name_space == "TrackFX" or "TrackFX" in l_func.reascript_name
+    ) and l_func.reascript_name not in track_fx_exceptions:
+        return "TrackFX"
+    # the or condition is for user namespaces, e.g. BR, CF
+    elif (
+        l_func.fn_name_space == "TakeFX" or "TakeFX" in l_func.reascript_name
+    ) and l_func.reascript_name not in take_fx_exceptions:
+        return "TakeFX"
+    elif (
+        l_func.fn_name_space == "PCM"
+        or l_func.arguments
+        and l_func.arguments[0].reascript_type in ("PCM_source", "PCM_sink")
+    ):
+        return "PCM"
+    elif l_func.arguments and l_func.arguments[0].reascript_type in REAPER_TYPES:
+        return l_func.arguments[0].reascript_type
 
-        if namespace not in by_name_space:
-            by_name_space[namespace] = []
-        by_name_space[namespace].append(l_func)
-    return by_name_space
+    elif l_func.fn_name_space in REAPER_NAMESPACES or l_func.fn_name_space is None:
+        return "Reaper"
+    return l_func.fn_name_space
 
 
 def generate_reawrap_name(namespace: str, fn_name_space: str, reascript_name: str):
@@ -497,133 +530,79 @@ def generate_reawrap_name(namespace: str, fn_name_space: str, reascript_name: st
     return reawrap_name
 
 
-def refine_functions(
-    by_name_space: dict[str, list[ReaFunc]],
-) -> dict[str, list[ReaFunc]]:
-    """Once the functions are grouped by namespace, refine the name by removing the namespace and converting it to snake_case.
-    Skip function that are declared as deprecated in the docs and remove duplicates."""
-
-    refined = {}
-    seen_funcs = {}
-    for name_space, functions in sorted(
-        by_name_space.items(), key=lambda item: item[0].lower()
-    ):
-        if name_space not in refined:
-            refined[name_space] = []
-        if name_space not in seen_funcs:
-            seen_funcs[name_space] = set()
-        for func in functions:
-            reawrap_name = generate_reawrap_name(
-                name_space, func.fn_name_space, func.reascript_name
-            )
-            func.reawrap_name = reawrap_name
-            if reawrap_name not in seen_funcs[name_space]:
-                # some ReaScript functions are duplicates and result in the same ReaWrap name, e.g. GetMediaItemTake and GetMediaItem_Take
-                seen_funcs[name_space].add(reawrap_name)
-                refined[name_space].append(func)
-
-    return refined
+def apply_special_cases(func: ReaFunc, name_space: str) -> bool:
+    """Selective renaming of functions superseded by a newer version, e.g. CountSelectedTracks2.
+    Return False if the function should be skipped in favour of the newer version."""
+    if name_space != "ReaProject":
+        return True
+    if func.reawrap_name in REAPROJECT_SUPERSEDED:
+        return False
+    if func.reawrap_name in ("count_selected_tracks2", "get_selected_track2"):
+        for arg in func.arguments:
+            if arg.name == "wantmaster":
+                arg.name = "want_master"
+                arg.is_optional = True
+    func.reawrap_name = REAPROJECT_RENAMES.get(func.reawrap_name, func.reawrap_name)
+    return True
+
+
+def cache_on_disk(func: Callable) -> Callable:
+    """Memoize the result of a parameterless function in a pickle file.
+    The cache key is a hash of the API docs (API_HTML) and of every *.py file in the modules_generator package,
+    so editing the docs, this module or the tables in __init__.py triggers a new parse.
+    """
 
+    @functools.wraps(func)
+    def wrapper():
+        digest = hashlib.blake2b(Path(API_HTML).read_bytes())
+        for source in sorted(Path(__file__).parent.glob("*.py")):
+            digest.update(source.read_bytes())
+        cache_file = CACHE_DIR / f"reaper_funcs_{digest.hexdigest()[:16]}.pkl"
+        if cache_file.exists():
+            try:
+                with open(cache_file, "rb") as f:
+                    return pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cache file {cache_file}: {e}")
+        result = func()
+        CACHE_DIR.mkdir(exist_ok=True)
+        with open(cache_file, "wb") as f:
+            pickle.dump(result, f)
+        return result
 
-def dedupe_functions(refined: dict[str, list[ReaFunc]]) -> dict[str, list[ReaFunc]]:
-    """Further refinement. Remove duplicates from the functions or deprecated functions. Apply selective renaming."""
-    deduped = {}
-    for name_space, functions in refined.items():
-        seen = set()
-        deduped[name_space] = []
-        for func in functions:
-            if func.docs and "deprecated" in func.docs.lower():
-                logger.debug(
-                    f"Skipping deprecated function: {func.reascript_name} | namespace: {name_space}"
-                )
-                continue
-            if func.docs and "discouraged" in func.docs.lower():
-                logger.debug(
-                    f"Skipping discouraged function: {func.reascript_name} | namespace: {name_space}"
-                )
-                continue
-            if (
-                func.reawrap_name == "count_selected_tracks"
-                and name_space == "ReaProject"
-            ):
-                continue
-
-            elif (
-                func.reawrap_name == "count_selected_tracks2"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "count_selected_tracks"
-                for arg in func.arguments:
-                    if arg.name == "wantmaster":
-                        arg.name = "want_master"
-                        arg.is_optional = True
-            elif (
-                func.reawrap_name == "add_project_marker" and name_space == "ReaProject"
-            ):
-                continue
-            elif (
-                func.reawrap_name == "add_project_marker2"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "add_project_marker"
-            elif (
-                func.reawrap_name == "enum_project_markers2"
-                and name_space == "ReaProject"
-            ):
-                continue
-
-            elif (
-                func.reawrap_name == "enum_project_markers3"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "enum_project_markers"
-
-            elif (
-                func.reawrap_name == "get_play_position_ex"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "get_play_position_lat_comp"
-
-            elif (
-                func.reawrap_name == "get_play_position2_ex"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "get_play_position"
-
-            elif (
-                func.reawrap_name == "get_project_time_signature2"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "get_project_time_signature"
-
-            elif (
-                func.reawrap_name == "get_selected_track" and name_space == "ReaProject"
-            ):
-                continue
-
-            elif (
-                func.reawrap_name == "get_selected_track2"
-                and name_space == "ReaProject"
-            ):
-                func.reawrap_name = "get_selected_track"
-                for arg in func.arguments:
-                    if arg.name == "wantmaster":
-                        arg.name = "want_master"
-                        arg.is_optional = True
-
-            if func.reawrap_name not in seen:
-                seen.add(func.reawrap_name)
-                deduped[name_space].append(func)
-    return deduped
+    return wrapper
 
 
+@cache_on_disk
 def get_functions_from_docs() -> dict[str, list[dict[str, str]]]:
     """Get LUA functions from the REAPER API docs."""
-    soup = get_html_from_file(API_HTML)
-    functions = list(iter_lua_functions(soup))
-    by_name_space = group_functions_by_name_space(functions)
-    refined = refine_functions(by_name_space)
-    return dedupe_functions(refined)
+    soup = get_html_from_file(API_HTML, parse_only=API_SECTIONS_STRAINER)
+    by_name_space = defaultdict(list)
+    refined_names = defaultdict(set)
+    seen = defaultdict(set)
+    for func in iter_lua_functions(soup):
+        name_space = get_name_space(func)
+        functions = by_name_space[name_space]
+        # Remove the namespace from the name and convert it to snake_case.
+        func.reawrap_name = generate_reawrap_name(
+            name_space, func.fn_name_space, func.reascript_name
+        )
+        if func.reawrap_name in refined_names[name_space]:
+            # some ReaScript functions are duplicates and result in the same ReaWrap name, e.g. GetMediaItemTake and GetMediaItem_Take
+            continue
+        refined_names[name_space].add(func.reawrap_name)
+        # Skip deprecated functions and apply selective renaming.
+        if func.docs and (match := _DEPRECATED_RE.search(func.docs)):
+            logger.debug(
+                f"Skipping {match.group(0).lower()} function: {func.reascript_name} | namespace: {name_space}"
+            )
+            continue
+        if not apply_special_cases(func, name_space):
+            continue
+        if func.reawrap_name not in seen[name_space]:
+            seen[name_space].add(func.reawrap_name)
+            functions.append(func)
+    return dict(sorted(by_name_space.items(), key=lambda item: item[0].lower()))
 
 
 def main():
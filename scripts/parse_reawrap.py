@@ -5,15 +5,34 @@ Extracts methods, classes, and documentation from LDoc comments.
 """
 
 import json
+import mmap
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+# One match per non-blank comment line, either an "@tag body" or a description text line
+_LDOC_LINE_RE = re.compile(
+    r"^[ \t]*+(?:---)?+[ \t]*+(?:@(?P<tag>\w+)(?:[ \t]+(?P<body>.*?))?|(?P<text>[^@\s].*?))[ \t\r]*$",
+    re.MULTILINE,
+)
+_PARAM_RE = re.compile(r"(\w+)\s+(.+?)(?:\s+(.+))?$")
+_RETURN_RE = re.compile(r"(.+?)(?:\s+(.+))?$")
+# Lua files are searched as bytes, only the matched groups are decoded
+_MODULE_RE = re.compile(rb"^---\s*@module\s+(\w+)", re.MULTILINE)
+# Pattern: --- comments --- function Class:method(...) or function Class.method(...)
+_FUNC_PATTERN = re.compile(rb"(---.*?)function\s+(\w+)[:.](\w+)\s*\(([^)]*)\)", re.DOTALL)
+_MODULE_DESC_RE = re.compile(rb"^---\s*([^@\n]+)", re.MULTILINE)
+
 def parse_ldoc_comment(comment: str) -> dict:
     """Parse an LDoc comment block."""
-    lines = [line.strip() for line in comment.split("\n") if line.strip()]
-    
     result = {
         "description": "",
         "parameters": [],
@@ -22,50 +41,53 @@ def parse_ldoc_comment(comment: str) -> dict:
     }
     
     current_desc = []
-    for line in lines:
-        if line.startswith("---"):
-            line = line[3:].strip()
-        
-        if line.startswith("@param"):
+    for match in _LDOC_LINE_RE.finditer(comment):
+        tag, body = match.group("tag", "body")
+        if tag is None:
+            current_desc.append(match.group("text"))
+        elif tag == "param":
             # @param name type description
-            match = re.match(r"@param\s+(\w+)\s+(.+?)(?:\s+(.+))?$", line)
-            if match:
-                name, type_part, desc = match.groups()
+            param_match = _PARAM_RE.match(body or "")
+            if param_match:
+                name, type_part, desc = param_match.groups()
                 result["parameters"].append({
                     "name": name,
                     "type": type_part.split()[0] if type_part else "any",
                     "description": desc or "",
                     "optional": "optional" in type_part.lower(),
                 })
-        elif line.startswith("@return"):
+        elif tag == "return":
             # @return type description
-            match = re.match(r"@return\s+(.+?)(?:\s+(.+))?$", line)
-            if match:
-                type_part, desc = match.groups()
+            return_match = _RETURN_RE.match(body or "")
+            if return_match:
+                type_part, desc = return_match.groups()
                 result["returns"].append({
                     "type": type_part.split()[0] if type_part else "any",
                     "description": desc or "",
                 })
-        elif line.startswith("@within"):
+        elif tag == "within":
             # @within category
-            result["category"] = line.replace("@within", "").strip()
-        elif line.startswith("@module"):
+            result["category"] = body or ""
+        elif tag == "module":
             # @module name
-            result["module"] = line.replace("@module", "").strip()
-        elif not line.startswith("@"):
-            current_desc.append(line)
+            result["module"] = body or ""
     
     result["description"] = " ".join(current_desc).strip()
     return result
 
 def parse_lua_file(file_path: Path) -> dict:
     """Parse a Lua file and extract class/method information."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # an empty file cannot be mapped
+            return parse_lua_content(b"", file_path.stem)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return parse_lua_content(content, file_path.stem)
+
+def parse_lua_content(content: bytes | mmap.mmap, default_name: str) -> dict:
+    """Extract class/method information from the content of a Lua file."""
     # Extract module name
-    module_match = re.search(r"^---\s*@module\s+(\w+)", content, re.MULTILINE)
-    module_name = module_match.group(1) if module_match else file_path.stem
+    module_match = _MODULE_RE.search(content)
+    module_name = module_match.group(1).decode("utf-8") if module_match else default_name
     
     class_data = {
         "name": module_name,
@@ -74,21 +96,15 @@ def parse_lua_file(file_path: Path) -> dict:
     }
     
     # Find all function definitions with their preceding comments
-    # Pattern: --- comments --- function Class:method(...) or function Class.method(...)
-    pattern = r"(---.*?)(?=function\s+(\w+)[:.](\w+)\s*\()"
-    
-    for match in re.finditer(pattern, content, re.DOTALL):
-        comment_block = match.group(1)
-        class_name = match.group(2)
-        method_name = match.group(3)
+    for match in _FUNC_PATTERN.finditer(content):
+        comment_block = match.group(1).decode("utf-8")
+        class_name = match.group(2).decode("utf-8")
+        method_name = match.group(3).decode("utf-8")
+        params = match.group(4).decode("utf-8")
         
         # Parse the comment
         doc = parse_ldoc_comment(comment_block)
-        
-        # Find the function signature
-        func_start = match.end()
-        func_match = re.search(r"function\s+\w+[:.]\w+\s*\(([^)]*)\)", content[func_start:func_start+200])
-        signature = f"{class_name}:{method_name}({func_match.group(1) if func_match else ''})"
+        signature = f"{class_name}:{method_name}({params})"
         
         method = {
             "name": method_name,
@@ -103,12 +119,19 @@ def parse_lua_file(file_path: Path) -> dict:
         class_data["methods"].append(method)
     
     # Also check for module-level description
-    module_desc_match = re.search(r"^---\s*([^@\n]+)", content, re.MULTILINE)
+    module_desc_match = _MODULE_DESC_RE.search(content)
     if module_desc_match:
-        class_data["description"] = module_desc_match.group(1).strip()
+        class_data["description"] = module_desc_match.group(1).decode("utf-8").strip()
     
     return class_data
 
+def try_parse_lua_file(file_path: Path) -> tuple[dict | None, Exception | None]:
+    """Parse a Lua file in a worker process, returning the error instead of raising it."""
+    try:
+        return parse_lua_file(file_path), None
+    except Exception as e:
+        return None, e
+
 def main():
     """Parse all ReaWrap Lua files."""
     reawrap_lua_dir = Path(__file__).parent.parent.parent / "ReaWrap" / "lua"
@@ -122,17 +145,20 @@ def main():
     classes = []
     
     # Find all .lua files
-    for lua_file in reawrap_lua_dir.rglob("*.lua"):
-        if lua_file.name == "constants.lua":  # Skip large constants file
-            continue
-        
-        try:
-            class_data = parse_lua_file(lua_file)
-            if class_data["methods"] or class_data["description"]:
+    lua_files = [
+        p for p in reawrap_lua_dir.rglob("*.lua")
+        if p.name != "constants.lua"  # Skip large constants file
+    ]
+    
+    # Files are independent, parse them across processes
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(try_parse_lua_file, lua_files, chunksize=4)
+        for lua_file, (class_data, error) in zip(lua_files, results):
+            if error is not None:
+                print(f"  Warning: Error parsing {lua_file}: {error}", file=sys.stderr)
+            elif class_data["methods"] or class_data["description"]:
                 classes.append(class_data)
                 print(f"  Parsed {class_data['name']}: {len(class_data['methods'])} methods", file=sys.stderr)
-        except Exception as e:
-            print(f"  Warning: Error parsing {lua_file}: {e}", file=sys.stderr)
     
     data = {
         "classes": classes,
@@ -144,8 +170,11 @@ def main():
     output_path = Path(__file__).parent.parent / "data" / "reawrap-api.json"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        output = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        output = json.dumps(data, indent=2).encode("utf-8")
+    output_path.write_bytes(output)
     
     print(f"\nSaved ReaWrap API data to {output_path}", file=sys.stderr)
     print(f"Total: {len(classes)} classes, {data['total_methods']} methods", file=sys.stderr)
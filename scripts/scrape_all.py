@@ -5,7 +5,10 @@ Run all scrapers/parsers to update API data.
 
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import TextIO
 
 SCRIPTS_DIR = Path(__file__).parent
 
@@ -15,30 +18,54 @@ SCRIPTERS = [
     ("ReaWrap", "parse_reawrap.py"),
 ]
 
+# Held for every write to stdout/stderr while scrapers run, so lines and banners never interleave
+_OUTPUT_LOCK = threading.Lock()
+
+def forward_lines(name: str, source: TextIO, target: TextIO):
+    """Forward each line of a scraper's output as soon as it is written, prefixed by the scraper name."""
+    for line in source:
+        with _OUTPUT_LOCK:
+            target.write(f"[{name}] {line}")
+            target.flush()
+
+def run_scraper(name: str, script: str) -> int:
+    """Run a scraper script, streaming its output, and return its exit code."""
+    script_path = SCRIPTS_DIR / script
+    with subprocess.Popen(
+        ["python3.13", str(script_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    ) as process:
+        stderr_thread = threading.Thread(target=forward_lines, args=(name, process.stderr, sys.stderr))
+        stderr_thread.start()
+        forward_lines(name, process.stdout, sys.stdout)
+        stderr_thread.join()
+        return process.wait()
+
 def main():
     """Run all scrapers."""
     print("=== Running all API scrapers/parsers ===\n")
     
-    for name, script in SCRIPTERS:
-        print(f"\n--- Running {name} scraper ---")
-        script_path = SCRIPTS_DIR / script
-        try:
-            result = subprocess.run(
-                ["python3.13", str(script_path)],
-                capture_output=True,
-                text=True,
-            )
-            if result.stdout:
-                print(result.stdout)
-            if result.stderr:
-                print(result.stderr, file=sys.stderr)
-            if result.returncode != 0:
-                print(f"Error: {name} scraper failed with code {result.returncode}", file=sys.stderr)
-        except Exception as e:
-            print(f"Error running {name} scraper: {e}", file=sys.stderr)
+    # The scrapers share no state, run them concurrently and report each one as it finishes
+    with ThreadPoolExecutor(max_workers=len(SCRIPTERS)) as executor:
+        futures = {executor.submit(run_scraper, name, script): name for name, script in SCRIPTERS}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                returncode = future.result()
+            except Exception as e:
+                with _OUTPUT_LOCK:
+                    print(f"Error running {name} scraper: {e}", file=sys.stderr, flush=True)
+                continue
+            with _OUTPUT_LOCK:
+                if returncode != 0:
+                    print(f"Error: {name} scraper failed with code {returncode}", file=sys.stderr, flush=True)
+                else:
+                    print(f"--- {name} scraper done ---", flush=True)
     
     print("\n=== All scrapers completed ===")
 
 if __name__ == "__main__":
     main()
-
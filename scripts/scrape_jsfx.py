@@ -6,37 +6,128 @@ Scrape JSFX documentation from https://www.reaper.fm/sdk/js/js.php
 import json
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from urllib.request import urlopen
 
 try:
-    from bs4 import BeautifulSoup
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+try:
+    from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 except ImportError:
     print("Error: beautifulsoup4 not installed. Run: pip install beautifulsoup4", file=sys.stderr)
     sys.exit(1)
 
-def fetch_url(url: str) -> str:
-    """Fetch a URL and return its content."""
+try:
+    import requests
+except ImportError:
+    print("Error: requests not installed. Run: pip install requests", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import requests_cache
+except ImportError:  # optional, pages are then downloaded on every run
+    requests_cache = None
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+# Cached responses are reused for a day, then revalidated with ETag/Last-Modified
+CACHE_EXPIRE_AFTER = 86400
+
+# All pages are on the same host, a session reuses the connection between them
+if requests_cache is not None:
+    _SESSION = requests_cache.CachedSession(
+        str(CACHE_DIR / "jsfx"), backend="sqlite", expire_after=CACHE_EXPIRE_AFTER
+    )
+else:
+    _SESSION = requests.Session()
+
+# Concurrent page downloads, kept low to be polite to the server
+MAX_FETCH_WORKERS = 8
+
+# function_name(params)
+_RE_FUNC_CALL = re.compile(r"(\w+)\s*\([^)]*\)")
+# function_name(params) -- description, as found in list items
+_RE_LI_FUNC = re.compile(r"(\*\*)?((\w+)\s*\([^)]*\))\s*[–-]\s*(.+)")
+# Common non-function patterns that look like calls
+_STOP = frozenset({"if", "while", "loop", "return", "abs", "min", "max"})
+# Navigation links that are not documentation sections
+_SKIP_SECTION = frozenset({"top", "Home", ""})
+# separator between a function name and its description.
+# IGNORECASE is deliberate: with Unicode case folding, characters such as the Kelvin sign
+# or the long s fold into a-z and do not count as separators, like in the original
+# per-function pattern.
+_RE_SEP = re.compile(r"[^a-zA-Z0-9_]+", re.IGNORECASE)
+
+# Common JSFX special variables, the same for every page
+_JSFX_SPECIAL_VARS = (
+    {"name": "spl0", "description": "Left channel audio sample", "type": "number", "scope": "@sample"},
+    {"name": "spl1", "description": "Right channel audio sample", "type": "number", "scope": "@sample"},
+    {"name": "slider1", "description": "First slider parameter", "type": "number"},
+    {"name": "param[0]", "description": "First parameter array access", "type": "number"},
+    {"name": "srate", "description": "Sample rate", "type": "number"},
+    {"name": "tempo", "description": "Current tempo", "type": "number"},
+    {"name": "play_state", "description": "Playback state", "type": "number"},
+    {"name": "gfx_w", "description": "Graphics width", "type": "number", "scope": "@gfx"},
+    {"name": "gfx_h", "description": "Graphics height", "type": "number", "scope": "@gfx"},
+    {"name": "mouse_x", "description": "Mouse X position", "type": "number", "scope": "@gfx"},
+    {"name": "mouse_y", "description": "Mouse Y position", "type": "number", "scope": "@gfx"},
+)
+
+# Common operators
+_JSFX_OPERATORS = (
+    {"operator": "+", "description": "Addition"},
+    {"operator": "-", "description": "Subtraction"},
+    {"operator": "*", "description": "Multiplication"},
+    {"operator": "/", "description": "Division"},
+    {"operator": "%", "description": "Modulo"},
+    {"operator": "=", "description": "Assignment"},
+    {"operator": "==", "description": "Equality"},
+    {"operator": "!=", "description": "Inequality"},
+    {"operator": "<", "description": "Less than"},
+    {"operator": ">", "description": "Greater than"},
+    {"operator": "<=", "description": "Less than or equal"},
+    {"operator": ">=", "description": "Greater than or equal"},
+    {"operator": "&&", "description": "Logical AND"},
+    {"operator": "||", "description": "Logical OR"},
+    {"operator": "!", "description": "Logical NOT"},
+    {"operator": "?:", "description": "Ternary operator"},
+)
+
+# Page discovery only looks at links, the rest of the main page is not built into the tree
+_LINK_STRAINER = SoupStrainer("a", href=True)
+
+def make_soup(html: bytes, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parse UTF-8 HTML with the lxml parser, falling back to the slower html.parser if lxml is not installed."""
+    try:
+        return BeautifulSoup(html, "lxml", from_encoding="utf-8", parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser", from_encoding="utf-8", parse_only=parse_only)
+
+def fetch_url(url: str) -> bytes:
+    """Fetch a URL and return its raw content, decoding is left to the parser."""
     print(f"Fetching {url}...", file=sys.stderr)
-    with urlopen(url) as response:
-        return response.read().decode("utf-8")
+    response = _SESSION.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
 
-def find_jsfx_pages(main_html: str) -> list[str]:
+def find_jsfx_pages(main_html: bytes) -> list[str]:
     """Find all JSFX documentation pages linked from the main page."""
-    soup = BeautifulSoup(main_html, "html.parser")
+    soup = make_soup(main_html, parse_only=_LINK_STRAINER)
     base_url = "https://www.reaper.fm/sdk/js/"
     pages = set()
     
     # Find all links that point to .php files in the js directory
     # These are in the navigation list in the intro section
-    for link in soup.find_all("a", href=True):
+    for link in soup.select("a[href]"):
         href = link.get("href", "")
         
         # Look for links containing .php (could have anchors)
         if ".php" in href and not href.startswith("http"):
             # Extract filename (remove anchor if present)
-            filename = href.split("#")[0]
+            filename = href.partition("#")[0]
             
             # Skip if it has path components going up (../) or is absolute path
             if "../" not in filename and not filename.startswith("/"):
@@ -53,16 +144,45 @@ def find_jsfx_pages(main_html: str) -> list[str]:
     for p in pages:
         if "/sdk/js/" in p:
             # Normalize URL (remove anchors, ensure consistent format)
-            normalized = p.split("#")[0]
+            normalized = p.partition("#")[0]
             if normalized not in seen:
                 seen.add(normalized)
                 filtered_pages.append(normalized)
     
     return sorted(filtered_pages)
 
-def parse_jsfx_html(html: str, url: str = "") -> dict:
+def find_func_context(func_name: str, text: str, text_lower: str) -> str | None:
+    """Return up to 300 characters of the line following the first mention of func_name in text."""
+    if not (text.isascii() and func_name.isascii()):
+        # Lower-casing may change the length of non-ASCII text (e.g. "İ") so offsets into
+        # text_lower would not line up with text, and case folding matches more than
+        # str.lower() does; let the regex engine do the case-insensitive search.
+        match = re.search(rf"{re.escape(func_name)}[^a-zA-Z0-9_]+(.{{0,300}})", text, re.IGNORECASE)
+        return match.group(1) if match else None
+    name = func_name.lower()
+    idx = text_lower.find(name)
+    while idx >= 0:
+        # the name must be followed by at least one non-word character
+        sep = _RE_SEP.match(text, idx + len(name))
+        if sep:
+            return text[sep.end():sep.end() + 300].split("\n", 1)[0]
+        idx = text_lower.find(name, idx + 1)
+    return None
+
+def get_text(el, cache: dict) -> str:
+    """Return el.get_text(strip=True), memoized by element identity in cache.
+    The cache must not outlive the soup the elements belong to."""
+    key = id(el)
+    text = cache.get(key)
+    if text is None:
+        text = cache[key] = el.get_text(strip=True)
+    return text
+
+def parse_jsfx_html(html: bytes, url: str = "") -> dict:
     """Parse JSFX HTML documentation from a single page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
+    # Text of elements visited more than once, e.g. the parent of several code blocks
+    text_cache = {}
     
     data = {
         "functions": [],
@@ -73,51 +193,52 @@ def parse_jsfx_html(html: str, url: str = "") -> dict:
     }
     
     # Extract sections
-    for link in soup.find_all("a", href=re.compile(r"^#")):
-        text = link.get_text(strip=True)
-        if text and text not in ("top", "Home"):
-            href = link.get("href", "")
-            if href.startswith("#"):
-                section_id = href[1:]
-                # Try to find the section content
-                section_el = soup.find(id=section_id) or soup.find("a", {"name": section_id})
-                if section_el:
-                    # Get description from following content
-                    desc = ""
-                    next_el = section_el.next_sibling
-                    if next_el:
-                        desc = next_el.get_text(strip=True)[:200]
-                    data["sections"].append({
-                        "name": text,
-                        "id": section_id,
-                        "description": desc,
-                    })
+    for link in soup.select("a[href^='#']"):
+        text = get_text(link, text_cache)
+        if text in _SKIP_SECTION:
+            continue
+        # The selector guarantees href starts with "#"
+        section_id = link["href"][1:]
+        # Try to find the section content
+        section_el = soup.find(id=section_id) or soup.find("a", {"name": section_id})
+        if section_el:
+            # Get description from following content
+            desc = ""
+            next_el = section_el.next_sibling
+            if next_el:
+                desc = get_text(next_el, text_cache)[:200]
+            data["sections"].append({
+                "name": text,
+                "id": section_id,
+                "description": desc,
+            })
     
-    # Extract function references from code blocks and text
-    seen_functions = set()
+    # Extract function references from code blocks and text.
+    # The same function may be listed several times, main keeps the first one.
     
     # Look for function definitions in code blocks
     for code in soup.find_all(["code", "pre"]):
-        text = code.get_text(strip=True)
+        text = get_text(code, text_cache)
+        parent = code.parent
+        # Surrounding text of the code block, read once the first function is found
+        desc_text = None
         # Look for function patterns like function_name(...)
-        func_matches = re.finditer(r"(\w+)\s*\([^)]*\)", text)
+        func_matches = _RE_FUNC_CALL.finditer(text)
         for match in func_matches:
             func_name = match.group(1)
             # Filter out common non-function patterns
-            if (func_name not in seen_functions and 
-                len(func_name) > 2 and 
-                func_name not in ["if", "while", "loop", "return", "abs", "min", "max"]):
-                seen_functions.add(func_name)
+            if len(func_name) > 2 and func_name not in _STOP:
                 # Get context/description
-                parent = code.parent
                 description = ""
                 if parent:
                     # Try to get description from surrounding text
-                    desc_text = parent.get_text(strip=True)
+                    if desc_text is None:
+                        desc_text = get_text(parent, text_cache)
+                        desc_text_lower = desc_text.lower()
                     # Look for function name followed by description
-                    desc_match = re.search(rf"{re.escape(func_name)}[^a-zA-Z0-9_]+(.{{0,300}})", desc_text, re.IGNORECASE)
-                    if desc_match:
-                        description = desc_match.group(1).strip()
+                    context = find_func_context(func_name, desc_text, desc_text_lower)
+                    if context is not None:
+                        description = context.strip()
                     else:
                         description = desc_text[:500]
                 
@@ -130,59 +251,20 @@ def parse_jsfx_html(html: str, url: str = "") -> dict:
     
     # Also look for function definitions in list items (like "sin(angle) -- returns...")
     for li in soup.find_all("li"):
-        text = li.get_text(strip=True)
+        text = get_text(li, text_cache)
         # Pattern: function_name(params) -- description
-        func_match = re.match(r"(\*\*)?(\w+)\s*\([^)]*\)\s*[–-]\s*(.+)", text)
+        func_match = _RE_LI_FUNC.match(text)
         if func_match:
-            func_name = func_match.group(2)
-            if func_name not in seen_functions:
-                seen_functions.add(func_name)
-                description = func_match.group(3).strip()
-                # Extract signature
-                sig_match = re.search(rf"{re.escape(func_name)}\s*\([^)]*\)", text)
-                signature = sig_match.group(0) if sig_match else f"{func_name}()"
-                
-                data["functions"].append({
-                    "name": func_name,
-                    "category": "unknown",
-                    "description": description,
-                    "signature": signature,
-                })
-    
-    # Common JSFX special variables
-    data["special_variables"] = [
-        {"name": "spl0", "description": "Left channel audio sample", "type": "number", "scope": "@sample"},
-        {"name": "spl1", "description": "Right channel audio sample", "type": "number", "scope": "@sample"},
-        {"name": "slider1", "description": "First slider parameter", "type": "number"},
-        {"name": "param[0]", "description": "First parameter array access", "type": "number"},
-        {"name": "srate", "description": "Sample rate", "type": "number"},
-        {"name": "tempo", "description": "Current tempo", "type": "number"},
-        {"name": "play_state", "description": "Playback state", "type": "number"},
-        {"name": "gfx_w", "description": "Graphics width", "type": "number", "scope": "@gfx"},
-        {"name": "gfx_h", "description": "Graphics height", "type": "number", "scope": "@gfx"},
-        {"name": "mouse_x", "description": "Mouse X position", "type": "number", "scope": "@gfx"},
-        {"name": "mouse_y", "description": "Mouse Y position", "type": "number", "scope": "@gfx"},
-    ]
-    
-    # Common operators
-    data["operators"] = [
-        {"operator": "+", "description": "Addition"},
-        {"operator": "-", "description": "Subtraction"},
-        {"operator": "*", "description": "Multiplication"},
-        {"operator": "/", "description": "Division"},
-        {"operator": "%", "description": "Modulo"},
-        {"operator": "=", "description": "Assignment"},
-        {"operator": "==", "description": "Equality"},
-        {"operator": "!=", "description": "Inequality"},
-        {"operator": "<", "description": "Less than"},
-        {"operator": ">", "description": "Greater than"},
-        {"operator": "<=", "description": "Less than or equal"},
-        {"operator": ">=", "description": "Greater than or equal"},
-        {"operator": "&&", "description": "Logical AND"},
-        {"operator": "||", "description": "Logical OR"},
-        {"operator": "!", "description": "Logical NOT"},
-        {"operator": "?:", "description": "Ternary operator"},
-    ]
+            func_name = func_match.group(3)
+            description = func_match.group(4).strip()
+            signature = func_match.group(2)
+            
+            data["functions"].append({
+                "name": func_name,
+                "category": "unknown",
+                "description": description,
+                "signature": signature,
+            })
     
     return data
 
@@ -200,56 +282,47 @@ def main():
         # Aggregate data from all pages
         all_data = {
             "functions": [],
-            "operators": [],
-            "special_variables": [],
+            "operators": list(_JSFX_OPERATORS),
+            "special_variables": list(_JSFX_SPECIAL_VARS),
             "sections": [],
             "scraped_at": datetime.now().isoformat(),
             "pages_scraped": [],
         }
         
-        seen_functions = set()
-        seen_operators = set()
-        seen_sections = set()
+        # Keyed by name, the first occurrence across all pages wins
+        functions = {}
+        sections = {}
         
-        # Scrape each page
-        for page_url in pages:
-            try:
-                print(f"  Scraping {page_url}...", file=sys.stderr)
-                html = fetch_url(page_url)
-                page_data = parse_jsfx_html(html, page_url)
-                
-                # Merge functions (avoid duplicates)
-                for func in page_data["functions"]:
-                    if func["name"] not in seen_functions:
-                        seen_functions.add(func["name"])
-                        all_data["functions"].append(func)
-                
-                # Merge operators (avoid duplicates)
-                for op in page_data["operators"]:
-                    op_key = op["operator"]
-                    if op_key not in seen_operators:
-                        seen_operators.add(op_key)
-                        all_data["operators"].append(op)
-                
-                # Merge sections (avoid duplicates by name)
-                for section in page_data["sections"]:
-                    if section["name"] not in seen_sections:
-                        seen_sections.add(section["name"])
-                        all_data["sections"].append(section)
-                
-                # Special variables are only added once (from first page or hardcoded)
-                if not all_data["special_variables"]:
-                    all_data["special_variables"] = page_data["special_variables"]
-                
-                all_data["pages_scraped"].append(page_url)
-            except Exception as e:
-                print(f"  Warning: Error scraping {page_url}: {e}", file=sys.stderr)
+        # Fetch pages concurrently, parse and merge them in page order on this thread
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            futures = [executor.submit(fetch_url, page_url) for page_url in pages]
+            for page_url, future in zip(pages, futures):
+                try:
+                    print(f"  Scraping {page_url}...", file=sys.stderr)
+                    html = future.result()
+                    page_data = parse_jsfx_html(html, page_url)
+                    
+                    # Merge functions and sections (avoid duplicates)
+                    for func in page_data["functions"]:
+                        functions.setdefault(func["name"], func)
+                    for section in page_data["sections"]:
+                        sections.setdefault(section["name"], section)
+                    
+                    all_data["pages_scraped"].append(page_url)
+                except Exception as e:
+                    print(f"  Warning: Error scraping {page_url}: {e}", file=sys.stderr)
+        
+        all_data["functions"] = list(functions.values())
+        all_data["sections"] = list(sections.values())
         
         output_path = Path(__file__).parent.parent / "data" / "jsfx-api.json"
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, "w") as f:
-            json.dump(all_data, f, indent=2)
+        if orjson is not None:
+            output = orjson.dumps(all_data, option=orjson.OPT_INDENT_2)
+        else:
+            output = json.dumps(all_data, indent=2).encode("utf-8")
+        output_path.write_bytes(output)
         
         print(f"\nSaved JSFX API data to {output_path}", file=sys.stderr)
         print(f"Found {len(all_data['functions'])} functions, {len(all_data['operators'])} operators, "
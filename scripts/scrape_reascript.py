@@ -7,91 +7,137 @@ Extracts ALL functions organized by language (C, EEL2, Lua, Python).
 import json
 import re
 import sys
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from urllib.request import urlopen
 
 try:
-    from bs4 import BeautifulSoup
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    print("Error: lxml not installed. Run: python3.13 -m pip install lxml", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import requests
 except ImportError:
-    print("Error: beautifulsoup4 not installed. Run: python3.13 -m pip install beautifulsoup4", file=sys.stderr)
+    print("Error: requests not installed. Run: python3.13 -m pip install requests", file=sys.stderr)
     sys.exit(1)
 
-def fetch_extremraym_docs() -> str:
+try:
+    import requests_cache
+except ImportError:  # optional, the page is then downloaded on every run
+    requests_cache = None
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+# Cached responses are reused for a day, then revalidated with ETag/Last-Modified
+CACHE_EXPIRE_AFTER = 86400
+
+# return_type reaper.function_name(params)
+_RE_LUA = re.compile(r'(\w+(?:\s*\*)?)?\s*reaper\.(\w+)\s*\((.*?)\)')
+# return_type RPR_function_name(params)
+_RE_PY = re.compile(r'(\w+(?:\s*\*)?)?\s*RPR_(\w+)\s*\((.*?)\)')
+# return_type function_name(params)
+_RE_STD = re.compile(r'(\w+(?:\s*\*)?)\s+(\w+)\s*\((.*?)\)')
+# function_name(params)
+_RE_NORET = re.compile(r'(\w+)\s*\((.*?)\)')
+_RE_PARAM_SPLIT = re.compile(r',\s*(?![^<>]*>)')
+# type name or type* name
+_RE_PARAM = re.compile(r'(\w+(?:\s*\*)?)\s+(\w+)')
+
+# The page is UTF-8, libxml2 would otherwise guess from the <meta> tag or assume Latin-1
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+# XPath expressions are compiled once and evaluated by libxml2
+_XP_SECTION = etree.XPath("//section[contains(concat(' ', normalize-space(@class), ' '), ' functions_all ')]")
+_XP_FUNC = etree.XPath(".//div[contains(concat(' ', normalize-space(@class), ' '), ' function_definition ')]")
+_LANGUAGE_BY_CLASS = {"c_func": "c", "e_func": "eel2", "l_func": "lua", "p_func": "python"}
+# All signature divs of a function in one query, told apart by their class tokens
+_XP_SIGNATURE_DIVS = etree.XPath(".//div[{}]".format(" or ".join(
+    f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')" for cls in _LANGUAGE_BY_CLASS
+)))
+
+@dataclass(slots=True)
+class Param:
+    type: str
+    name: str | None
+
+@dataclass(slots=True)
+class FuncSig:
+    return_type: str | None
+    name: str
+    parameters: list[Param]
+
+def fetch_extremraym_docs() -> bytes:
     """Fetch ReaScript API documentation from extremraym.com."""
     url = "https://www.extremraym.com/cloud/reascript-doc/"
     print(f"Fetching ReaScript API docs from {url}...", file=sys.stderr)
-    with urlopen(url) as response:
-        return response.read().decode("utf-8")
+    if requests_cache is not None:
+        session = requests_cache.CachedSession(
+            str(CACHE_DIR / "reascript"), backend="sqlite", expire_after=CACHE_EXPIRE_AFTER
+        )
+    else:
+        session = requests.Session()
+    with session:
+        response = session.get(url, timeout=30)
+    response.raise_for_status()
+    # the raw bytes are handed to libxml2, which decodes them itself
+    return response.content
 
-def parse_function_signature(sig_text: str, language: str = "c") -> dict:
+def parse_function_signature(sig_text: str, language: str = "c") -> FuncSig | None:
     """Parse a function signature to extract return type, name, and parameters."""
-    # Remove HTML tags and clean up
-    sig_text = re.sub(r'<[^>]+>', '', sig_text).strip()
+    # The text comes from text_content(), tags are already gone
+    sig_text = sig_text.strip()
     
     # Handle Lua format: reaper.FunctionName(...)
     if language == "lua" and "reaper." in sig_text:
         # Extract: return_type reaper.function_name(params)
-        pattern = r'(\w+(?:\s*\*)?)?\s*reaper\.(\w+)\s*\((.*?)\)'
-        match = re.match(pattern, sig_text)
+        match = _RE_LUA.match(sig_text)
         if match:
             return_type = match.group(1).strip() if match.group(1) else None
             name = match.group(2).strip()
             params_str = match.group(3).strip()
-            return {
-                "return_type": return_type,
-                "name": name,
-                "parameters": parse_parameters(params_str),
-            }
+            return FuncSig(return_type, name, parse_parameters(params_str))
     
     # Handle Python format: RPR_FunctionName(...)
     if language == "python" and "RPR_" in sig_text:
-        pattern = r'(\w+(?:\s*\*)?)?\s*RPR_(\w+)\s*\((.*?)\)'
-        match = re.match(pattern, sig_text)
+        match = _RE_PY.match(sig_text)
         if match:
             return_type = match.group(1).strip() if match.group(1) else None
             name = match.group(2).strip()
             params_str = match.group(3).strip()
-            return {
-                "return_type": return_type,
-                "name": name,
-                "parameters": parse_parameters(params_str),
-            }
+            return FuncSig(return_type, name, parse_parameters(params_str))
     
     # Standard pattern: return_type function_name(param1, param2, ...)
-    pattern = r'(\w+(?:\s*\*)?)\s+(\w+)\s*\((.*?)\)'
-    match = re.match(pattern, sig_text)
+    match = _RE_STD.match(sig_text)
     
     if not match:
         # Try without return type
-        pattern = r'(\w+)\s*\((.*?)\)'
-        match = re.match(pattern, sig_text)
+        match = _RE_NORET.match(sig_text)
         if match:
-            return {
-                "return_type": None,
-                "name": match.group(1),
-                "parameters": parse_parameters(match.group(2)),
-            }
+            return FuncSig(None, match.group(1), parse_parameters(match.group(2)))
         return None
     
     return_type = match.group(1).strip()
     name = match.group(2).strip()
     params_str = match.group(3).strip()
     
-    return {
-        "return_type": return_type if return_type else None,
-        "name": name,
-        "parameters": parse_parameters(params_str),
-    }
+    return FuncSig(return_type if return_type else None, name, parse_parameters(params_str))
 
-def parse_parameters(params_str: str) -> list[dict]:
+def parse_parameters(params_str: str) -> list[Param]:
     """Parse function parameters from a string."""
-    if not params_str or params_str.strip() == "":
+    params_str = params_str.strip()
+    if not params_str:
         return []
     
     params = []
     # Split by comma, but be careful with nested types like "MediaTrack*"
-    parts = re.split(r',\s*(?![^<>]*>)', params_str)
+    parts = _RE_PARAM_SPLIT.split(params_str)
     
     for part in parts:
         part = part.strip()
@@ -99,26 +145,20 @@ def parse_parameters(params_str: str) -> list[dict]:
             continue
         
         # Pattern: type name or type* name
-        param_match = re.match(r'(\w+(?:\s*\*)?)\s+(\w+)', part)
+        param_match = _RE_PARAM.match(part)
         if param_match:
             param_type = param_match.group(1).strip()
             param_name = param_match.group(2).strip()
-            params.append({
-                "type": param_type,
-                "name": param_name,
-            })
+            params.append(Param(param_type, param_name))
         else:
             # Just type, no name
-            params.append({
-                "type": part,
-                "name": None,
-            })
+            params.append(Param(part, None))
     
     return params
 
-def scrape_all_functions(html: str) -> dict:
-    """Scrape all functions from the HTML, organized by language."""
-    soup = BeautifulSoup(html, "html.parser")
+def scrape_all_functions(html: bytes) -> dict:
+    """Scrape all functions from the UTF-8 encoded HTML, organized by language."""
+    root = lxml_html.fromstring(html, parser=_HTML_PARSER)
     
     # Store all functions with all their language signatures
     all_functions = {}
@@ -132,20 +172,20 @@ def scrape_all_functions(html: str) -> dict:
     }
     
     # Find all function definitions
-    functions_section = soup.find("section", class_="functions_all")
-    if not functions_section:
+    functions_sections = _XP_SECTION(root)
+    if not functions_sections:
         print("Warning: Could not find functions_all section", file=sys.stderr)
         return {"all_functions": all_functions, "by_language": functions_by_language}
     
-    for func_div in functions_section.find_all("div", class_="function_definition"):
+    for func_div in _XP_FUNC(functions_sections[0]):
         func_id = func_div.get("id", "")
         
         # Extract function name from ID
         function_name = func_id
         
         # Get description
-        desc_p = func_div.find("p")
-        description = desc_p.get_text(strip=True) if desc_p else ""
+        desc_p = func_div.find(".//p")
+        description = desc_p.text_content().strip() if desc_p is not None else ""
         
         # Initialize function data
         if function_name not in all_functions:
@@ -158,55 +198,30 @@ def scrape_all_functions(html: str) -> dict:
         
         func_data = all_functions[function_name]
         
-        # Extract signatures for each language
-        c_func = func_div.find("div", class_="c_func")
-        e_func = func_div.find("div", class_="e_func")
-        l_func = func_div.find("div", class_="l_func")
-        p_func = func_div.find("div", class_="p_func")
-        
-        # Parse C/C++ signature
-        if c_func:
-            c_code = c_func.find("code")
-            if c_code:
-                sig = parse_function_signature(c_code.get_text(), "c")
-                if sig:
-                    func_data["signatures"]["c"] = sig
-                    if "c" not in func_data["available_in"]:
-                        func_data["available_in"].append("c")
-                        functions_by_language["c"].append(function_name)
+        # First <code> of the first div of each language
+        codes = {}
+        for sig_div in _XP_SIGNATURE_DIVS(func_div):
+            for cls in sig_div.get("class", "").split():
+                language = _LANGUAGE_BY_CLASS.get(cls)
+                if language is not None and language not in codes:
+                    codes[language] = sig_div.find(".//code")
         
-        # Parse EEL2 signature
-        if e_func:
-            e_code = e_func.find("code")
-            if e_code:
-                sig = parse_function_signature(e_code.get_text(), "eel2")
-                if sig:
-                    func_data["signatures"]["eel2"] = sig
-                    if "eel2" not in func_data["available_in"]:
-                        func_data["available_in"].append("eel2")
-                        functions_by_language["eel2"].append(function_name)
-        
-        # Parse Lua signature
-        if l_func:
-            l_code = l_func.find("code")
-            if l_code:
-                sig = parse_function_signature(l_code.get_text(), "lua")
-                if sig:
-                    func_data["signatures"]["lua"] = sig
-                    if "lua" not in func_data["available_in"]:
-                        func_data["available_in"].append("lua")
-                        functions_by_language["lua"].append(function_name)
+        # Extract signatures for each language
+        found_signature = False
+        for language in functions_by_language:
+            code = codes.get(language)
+            if code is None:
+                continue
+            sig = parse_function_signature(code.text_content(), language)
+            if sig:
+                found_signature = True
+                func_data["signatures"][language] = sig
+                if language not in func_data["available_in"]:
+                    func_data["available_in"].append(language)
+                    functions_by_language[language].append(function_name)
         
-        # Parse Python signature
-        if p_func:
-            p_code = p_func.find("code")
-            if p_code:
-                sig = parse_function_signature(p_code.get_text(), "python")
-                if sig:
-                    func_data["signatures"]["python"] = sig
-                    if "python" not in func_data["available_in"]:
-                        func_data["available_in"].append("python")
-                        functions_by_language["python"].append(function_name)
+        if not found_signature:
+            print(f"Warning: No signature found for {function_name!r}", file=sys.stderr)
     
     return {
         "all_functions": all_functions,
@@ -239,8 +254,12 @@ def main():
     output_path = Path(__file__).parent.parent / "data" / "reascript-api.json"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Signatures are FuncSig dataclasses, serialized natively by orjson
+    if orjson is not None:
+        output = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        output = json.dumps(data, indent=2, default=asdict).encode("utf-8")
+    output_path.write_bytes(output)
     
     print(f"Saved ReaScript API data to {output_path}", file=sys.stderr)
     print(f"Total unique functions: {data['total_unique_functions']}", file=sys.stderr)